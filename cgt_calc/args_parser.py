@@ -2,6 +2,7 @@
 
 import argparse
 import datetime
+import functools
 
 from .const import (
     DEFAULT_EXCHANGE_RATES_FILE,
@@ -12,21 +13,21 @@ from .const import (
 
 def get_last_elapsed_tax_year() -> int:
     """Get last ended tax year."""
-    now = datetime.datetime.now()
-    if now.date() >= datetime.date(now.year, 4, 6):
-        return now.year - 1
-    return now.year - 2
+    today = datetime.date.today()
+    # Tax year starts on 6 April
+    return today.year - (1 if (today.month, today.day) >= (4, 6) else 2)
 
 
-def create_parser() -> argparse.ArgumentParser:
-    """Create ArgumentParser."""
+def _build_parser() -> argparse.ArgumentParser:
+    """Build a new ArgumentParser."""
+    last_elapsed_tax_year = get_last_elapsed_tax_year()
     parser = argparse.ArgumentParser(
         description="Calculate capital gains from stock transactions.",
     )
     parser.add_argument(
         "--year",
         type=int,
-        default=get_last_elapsed_tax_year(),
+        default=last_elapsed_tax_year,
         nargs="?",
         help="First year of the tax year to calculate gains on (default: %(default)d)",
     )
@@ -165,3 +166,13 @@ def create_parser() -> argparse.ArgumentParser:
         help=argparse.SUPPRESS,
     )
     return parser
+
+
+@functools.lru_cache(maxsize=1)
+def create_parser() -> argparse.ArgumentParser:
+    """Create ArgumentParser.
+
+    The parser is built once and shared between calls, use _build_parser()
+    to get a fresh instance which is safe to modify.
+    """
+    return _build_parser()
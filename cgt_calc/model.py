@@ -71,6 +71,21 @@ class ActionType(Enum):
 class BrokerTransaction:
     """Broken transaction data."""
 
+    # Parsers create one instance per row, so avoid a per-instance __dict__.
+    # Replace with @dataclass(slots=True) once Python 3.9 support is dropped.
+    __slots__ = (
+        "date",
+        "action",
+        "symbol",
+        "description",
+        "quantity",
+        "price",
+        "fees",
+        "amount",
+        "currency",
+        "broker",
+    )
+
     date: datetime.date
     action: ActionType
     symbol: str | None
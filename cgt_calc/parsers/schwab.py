@@ -7,9 +7,11 @@ import csv
 import datetime
 from decimal import Decimal
 from enum import Enum
-from itertools import chain
+import functools
+import heapq
+import logging
 from pathlib import Path
-from typing import Final
+from typing import Final, NamedTuple
 
 from cgt_calc.const import TICKER_RENAMES
 from cgt_calc.exceptions import (
@@ -20,11 +22,59 @@ from cgt_calc.exceptions import (
 )
 from cgt_calc.model import ActionType, BrokerTransaction
 from cgt_calc.parsers.schwab_equity_award_json import read_schwab_equity_award_json_transactions
-from cgt_calc.parsers.schwab_util import AwardPrices
+from cgt_calc.parsers.schwab_util import (
+    AwardPrices,
+    list_folder_files,
+    parse_schwab_awards_date,
+    parse_schwab_date,
+)
+from cgt_calc.util import decimal_from_str
+
+LOGGER = logging.getLogger(__name__)
 
 OLD_COLUMNS_NUM: Final = 9
 NEW_COLUMNS_NUM: Final = 8
 
+LABEL_TO_ACTION: Final[dict[str, ActionType]] = {
+    "Buy": ActionType.BUY,
+    "Sell": ActionType.SELL,
+    "MoneyLink Transfer": ActionType.TRANSFER,
+    "Misc Cash Entry": ActionType.TRANSFER,
+    "Service Fee": ActionType.TRANSFER,
+    "Wire Funds": ActionType.TRANSFER,
+    "Wire Sent": ActionType.TRANSFER,
+    "Funds Received": ActionType.TRANSFER,
+    "Journal": ActionType.TRANSFER,
+    "Cash In Lieu": ActionType.TRANSFER,
+    "Visa Purchase": ActionType.TRANSFER,
+    "MoneyLink Deposit": ActionType.TRANSFER,
+    "MoneyLink Adj": ActionType.TRANSFER,  # likely a returned transfer
+    "Stock Plan Activity": ActionType.STOCK_ACTIVITY,
+    "Qualified Dividend": ActionType.DIVIDEND,
+    "Cash Dividend": ActionType.DIVIDEND,
+    "Qual Div Reinvest": ActionType.DIVIDEND,
+    "Div Adjustment": ActionType.DIVIDEND,
+    "Special Qual Div": ActionType.DIVIDEND,
+    "Non-Qualified Div": ActionType.DIVIDEND,
+    "NRA Tax Adj": ActionType.TAX,
+    "NRA Withholding": ActionType.TAX,
+    "Foreign Tax Paid": ActionType.TAX,
+    "ADR Mgmt Fee": ActionType.FEE,
+    "Adjustment": ActionType.ADJUSTMENT,
+    "IRS Withhold Adj": ActionType.ADJUSTMENT,
+    "Wire Funds Adj": ActionType.ADJUSTMENT,
+    "Short Term Cap Gain": ActionType.CAPITAL_GAIN,
+    "Long Term Cap Gain": ActionType.CAPITAL_GAIN,
+    "Spin-off": ActionType.SPIN_OFF,
+    "Credit Interest": ActionType.INTEREST,
+    "Reinvest Shares": ActionType.REINVEST_SHARES,
+    "Reinvest Dividend": ActionType.REINVEST_DIVIDENDS,
+    "Wire Funds Received": ActionType.WIRE_FUNDS_RECEIVED,
+    "Stock Split": ActionType.STOCK_SPLIT,
+    "Cash Merger": ActionType.CASH_MERGER,
+    "Cash Merger Adj": ActionType.CASH_MERGER,
+}
+
 
 class SchwabTransactionsFileRequiredHeaders(str, Enum):
     """Enum to list the headers in Schwab transactions file that we will use."""
@@ -47,140 +97,95 @@ class AwardsTransactionsFileRequiredHeaders(str, Enum):
     FAIR_MARKET_VALUE_PRICE = "FairMarketValuePrice"
 
 
-def action_from_str(label: str) -> ActionType:
-    """Convert string label to ActionType."""
-    if label == "Buy":
-        return ActionType.BUY
-
-    if label == "Sell":
-        return ActionType.SELL
-
-    if label in [
-        "MoneyLink Transfer",
-        "Misc Cash Entry",
-        "Service Fee",
-        "Wire Funds",
-        "Wire Sent",
-        "Funds Received",
-        "Journal",
-        "Cash In Lieu",
-        "Visa Purchase",
-        "MoneyLink Deposit",
-        "MoneyLink Adj",  # likely a returned transfer
-    ]:
-        return ActionType.TRANSFER
-
-    if label in "Stock Plan Activity":
-        return ActionType.STOCK_ACTIVITY
-
-    if label in [
-        "Qualified Dividend",
-        "Cash Dividend",
-        "Qual Div Reinvest",
-        "Div Adjustment",
-        "Special Qual Div",
-        "Non-Qualified Div",
-    ]:
-        return ActionType.DIVIDEND
-
-    if label in ["NRA Tax Adj", "NRA Withholding", "Foreign Tax Paid"]:
-        return ActionType.TAX
-
-    if label == "ADR Mgmt Fee":
-        return ActionType.FEE
-
-    if label in ["Adjustment", "IRS Withhold Adj", "Wire Funds Adj"]:
-        return ActionType.ADJUSTMENT
+SCHWAB_REQUIRED_HEADERS: Final[frozenset[str]] = frozenset(
+    header.value for header in SchwabTransactionsFileRequiredHeaders
+)
+AWARDS_REQUIRED_HEADERS: Final[frozenset[str]] = frozenset(
+    header.value for header in AwardsTransactionsFileRequiredHeaders
+)
 
-    if label in ["Short Term Cap Gain", "Long Term Cap Gain"]:
-        return ActionType.CAPITAL_GAIN
 
-    if label == "Spin-off":
-        return ActionType.SPIN_OFF
+class SchwabColumnIndex(NamedTuple):
+    """Column positions of the required headers in a transactions file."""
 
-    if label == "Credit Interest":
-        return ActionType.INTEREST
+    date: int
+    action: int
+    symbol: int
+    description: int
+    price: int
+    quantity: int
+    fees_and_comm: int
+    amount: int
 
-    if label == "Reinvest Shares":
-        return ActionType.REINVEST_SHARES
 
-    if label == "Reinvest Dividend":
-        return ActionType.REINVEST_DIVIDENDS
+def _schwab_column_index(headers: list[str]) -> SchwabColumnIndex:
+    """Find the column position of each required header in the file."""
+    # Resolved once per file so rows are indexed with plain ints
+    required = SchwabTransactionsFileRequiredHeaders
+    return SchwabColumnIndex(
+        date=headers.index(required.DATE.value),
+        action=headers.index(required.ACTION.value),
+        symbol=headers.index(required.SYMBOL.value),
+        description=headers.index(required.DESCRIPTION.value),
+        price=headers.index(required.PRICE.value),
+        quantity=headers.index(required.QUANTITY.value),
+        fees_and_comm=headers.index(required.FEES_AND_COMM.value),
+        amount=headers.index(required.AMOUNT.value),
+    )
 
-    if label == "Wire Funds Received":
-        return ActionType.WIRE_FUNDS_RECEIVED
 
-    if label == "Stock Split":
-        return ActionType.STOCK_SPLIT
+# Many rows share the same values, and Decimal is immutable, so cache them
+_decimal_from_str = functools.lru_cache(maxsize=8192)(decimal_from_str)
 
-    if label in ["Cash Merger", "Cash Merger Adj"]:
-        return ActionType.CASH_MERGER
 
-    raise ParsingError("schwab transactions", f"Unknown action: {label}")
+def action_from_str(label: str) -> ActionType:
+    """Convert string label to ActionType."""
+    action = LABEL_TO_ACTION.get(label)
+    if action is None:
+        raise ParsingError("schwab transactions", f"Unknown action: {label}")
+    return action
 
 
 class SchwabTransaction(BrokerTransaction):
     """Represent single Schwab transaction."""
 
+    __slots__ = ("raw_action",)
+
     def __init__(
         self,
-        row_dict: OrderedDict[str, str],
+        row: list[str],
+        column_index: SchwabColumnIndex,
         file: str,
     ):
         """Create transaction from CSV row."""
-        if len(row_dict) < NEW_COLUMNS_NUM or len(row_dict) > OLD_COLUMNS_NUM:
+        if len(row) < NEW_COLUMNS_NUM or len(row) > OLD_COLUMNS_NUM:
             # Old transactions had empty 9th column.
-            raise UnexpectedColumnCountError(
-                list(row_dict.values()), NEW_COLUMNS_NUM, file
-            )
-        if len(row_dict) == OLD_COLUMNS_NUM and list(row_dict.values())[-1] != "":
+            raise UnexpectedColumnCountError(row, NEW_COLUMNS_NUM, file)
+        if len(row) == OLD_COLUMNS_NUM and row[-1] != "":
             raise ParsingError(file, f"Column {OLD_COLUMNS_NUM} should be empty")
-        as_of_str = " as of "
-        date_header = SchwabTransactionsFileRequiredHeaders.DATE.value
-        if as_of_str in row_dict[date_header]:
-            index = row_dict[date_header].find(as_of_str) + len(as_of_str)
-            date_str = row_dict[date_header][index:]
-        else:
-            date_str = row_dict[date_header]
+        # Dates may be given as "MM/DD/YYYY as of MM/DD/YYYY", use the latter.
+        # rpartition() returns the whole string as tail if there is no match.
+        date_str = row[column_index.date].rpartition(" as of ")[2]
         try:
-            date = datetime.datetime.strptime(date_str, "%m/%d/%Y").date()
+            date = parse_schwab_date(date_str)
         except ValueError as exc:
             raise ParsingError(
-                file, f"Invalid date format: {date_str} from row: {row_dict}"
+                file, f"Invalid date format: {date_str} from row: {row}"
             ) from exc
-        action_header = SchwabTransactionsFileRequiredHeaders.ACTION.value
-        self.raw_action = row_dict[action_header]
+        self.raw_action = row[column_index.action]
         action = action_from_str(self.raw_action)
-        symbol_header = SchwabTransactionsFileRequiredHeaders.SYMBOL.value
-        symbol = row_dict[symbol_header] if row_dict[symbol_header] != "" else None
+        symbol = row[column_index.symbol] or None
         if symbol is not None:
             symbol = TICKER_RENAMES.get(symbol, symbol)
-        description_header = SchwabTransactionsFileRequiredHeaders.DESCRIPTION.value
-        description = row_dict[description_header]
-        price_header = SchwabTransactionsFileRequiredHeaders.PRICE.value
-        price = (
-            Decimal(row_dict[price_header].replace("$", ""))
-            if row_dict[price_header] != ""
-            else None
-        )
-        quantity_header = SchwabTransactionsFileRequiredHeaders.QUANTITY.value
-        quantity = (
-            Decimal(row_dict[quantity_header].replace(",", ""))
-            if row_dict[quantity_header] != ""
-            else None
-        )
-        fees_header = SchwabTransactionsFileRequiredHeaders.FEES_AND_COMM.value
-        fees = (
-            Decimal(row_dict[fees_header].replace("$", ""))
-            if row_dict[fees_header] != ""
-            else Decimal(0)
-        )
-        amount_header = SchwabTransactionsFileRequiredHeaders.AMOUNT.value
-        amount = (
-            Decimal(row_dict[amount_header].replace("$", ""))
-            if row_dict[amount_header] != ""
-            else None
-        )
+        description = row[column_index.description]
+        price_str = row[column_index.price]
+        price = _decimal_from_str(price_str) if price_str != "" else None
+        quantity_str = row[column_index.quantity]
+        quantity = _decimal_from_str(quantity_str) if quantity_str != "" else None
+        fees_str = row[column_index.fees_and_comm]
+        fees = _decimal_from_str(fees_str) if fees_str != "" else Decimal(0)
+        amount_str = row[column_index.amount]
+        amount = _decimal_from_str(amount_str) if amount_str != "" else None
 
         currency = "USD"
         broker = "Charles Schwab"
@@ -199,13 +204,16 @@ class SchwabTransaction(BrokerTransaction):
 
     @staticmethod
     def create(
-        row_dict: OrderedDict[str, str], file: str, awards_prices: AwardPrices
+        row: list[str],
+        column_index: SchwabColumnIndex,
+        file: str,
+        awards_prices: AwardPrices,
     ) -> SchwabTransaction:
         """Create and post process a SchwabTransaction."""
-        transaction = SchwabTransaction(row_dict, file)
+        transaction = SchwabTransaction(row, column_index, file)
         if (
-            transaction.price is None
-            and transaction.action == ActionType.STOCK_ACTIVITY
+            transaction.action is ActionType.STOCK_ACTIVITY
+            and transaction.price is None
         ):
             symbol = transaction.symbol
             if symbol is None:
@@ -224,6 +232,10 @@ class SchwabTransaction(BrokerTransaction):
 def _unify_schwab_cash_merger_trxs(
     transactions: list[SchwabTransaction],
 ) -> list[SchwabTransaction]:
+    if not any(
+        transaction.raw_action == "Cash Merger Adj" for transaction in transactions
+    ):
+        return transactions
     filtered: list[SchwabTransaction] = []
     for transaction in transactions:
         if transaction.raw_action == "Cash Merger Adj":
@@ -255,14 +267,73 @@ def _unify_schwab_cash_merger_trxs(
     return filtered
 
 
+def _remove_ignored_sym_dates(
+    transactions: list[SchwabTransaction],
+    ignored_sym_dates: set[tuple[datetime.date, str]],
+) -> list[SchwabTransaction]:
+    clean_transactions: list[SchwabTransaction] = []
+    for tr in transactions:
+        if (tr.date, tr.symbol) in ignored_sym_dates:
+            LOGGER.info(
+                "Removing STOCK_ACTIVITY transaction already present in "
+                "Equity Awards data: %s:%s:%s",
+                tr.symbol,
+                tr.date,
+                tr.quantity,
+            )
+        else:
+            clean_transactions.append(tr)
+    return clean_transactions
+
+
+def _read_schwab_transactions_file(
+    file: str,
+    awards_prices: AwardPrices,
+    ignored_sym_dates: set[tuple[datetime.date, str]] | None,
+) -> list[SchwabTransaction]:
+    """Read Schwab transactions from a single CSV file."""
+    try:
+        with Path(file).open(encoding="utf-8") as csv_file:
+            reader = csv.reader(csv_file)
+            headers = next(reader, [])
+
+            if not SCHWAB_REQUIRED_HEADERS.issubset(headers):
+                raise ParsingError(
+                    file,
+                    "Missing columns in Schwab transaction file: "
+                    f"{set(SCHWAB_REQUIRED_HEADERS.difference(headers))}",
+                )
+
+            column_index = _schwab_column_index(headers)
+            transactions = [
+                SchwabTransaction.create(row, column_index, file, awards_prices)
+                for row in reader
+                if any(row)
+            ]
+    except FileNotFoundError:
+        print(f"WARNING: Couldn't locate Schwab transactions file({file})")
+        return []
+
+    transactions = _unify_schwab_cash_merger_trxs(transactions)
+    transactions.reverse()
+    if ignored_sym_dates:
+        transactions = _remove_ignored_sym_dates(transactions, ignored_sym_dates)
+    return transactions
+
+
 def read_schwab_transactions(
     transactions_file: str | None,
     transactions_folder: str | None,
     schwab_award_transactions_file: str | None,
     schwab_award_transactions_folder: str | None,
     award_prices: AwardPrices = AwardPrices({}),
+    ignored_sym_dates: set[tuple[datetime.date, str]] | None = None,
 ) -> list[BrokerTransaction]:
-    """Read Schwab transactions from file."""
+    """Read Schwab transactions from file.
+
+    Transactions matching any of ignored_sym_dates by date and symbol are
+    dropped, as they were already read from a more accurate source.
+    """
     
     awards_prices = award_prices.merge(_read_schwab_awards_all(schwab_award_transactions_file, schwab_award_transactions_folder))
 
@@ -271,42 +342,14 @@ def read_schwab_transactions(
         files.append(transactions_file)
         
     if transactions_folder:
-        files.extend(Path(transactions_folder).glob("*.csv"))
+        files.extend(list_folder_files(transactions_folder, ".csv"))
 
     all_transactions: list[SchwabTransaction] = []
-    
     for file in files:
-        print(f"Parsing {file}")
-        try:
-            with Path(file).open(encoding="utf-8") as csv_file:
-                lines = list(csv.reader(csv_file))
-                headers = lines[0]
-
-                required_headers = set(
-                    {header.value for header in SchwabTransactionsFileRequiredHeaders}
-                )
-                if not required_headers.issubset(headers):
-                    raise ParsingError(
-                        transactions_file,
-                        "Missing columns in Schwab transaction file: "
-                        f"{required_headers.difference(headers)}",
-                    )
-
-                # Remove header
-                lines = lines[1:]
-                transactions = [
-                    SchwabTransaction.create(
-                        OrderedDict(zip(headers, row)), transactions_file, awards_prices
-                    )
-                    for row in lines
-                    if any(row)
-                ]
-                transactions = _unify_schwab_cash_merger_trxs(transactions)
-                transactions.reverse()
-                all_transactions.extend(transactions)
-        except FileNotFoundError:
-            print(f"WARNING: Couldn't locate Schwab transactions file({file})")
-
+        LOGGER.info("Parsing %s", file)
+        all_transactions.extend(
+            _read_schwab_transactions_file(file, awards_prices, ignored_sym_dates)
+        )
     all_transactions.sort(key=lambda k: k.date)
     return all_transactions
 
@@ -320,13 +363,9 @@ def _read_schwab_awards_all(
         files.append(schwab_award_transactions_file)
         
     if schwab_award_transactions_folder:
-        files.extend(Path(schwab_award_transactions_folder).glob("*.csv"))
+        files.extend(list_folder_files(schwab_award_transactions_folder, ".csv"))
         
-    award_prices = AwardPrices(award_prices={})
-    for file in files:
-        award_prices = award_prices.merge(_read_schwab_awards(file))
-        
-    return award_prices
+    return AwardPrices.merge_many(_read_schwab_awards(file) for file in files)
 
 
 def _read_schwab_awards(
@@ -335,75 +374,60 @@ def _read_schwab_awards(
     """Read initial stock prices from CSV file."""
     initial_prices: dict[datetime.date, dict[str, Decimal]] = defaultdict(dict)
 
-    headers = []
-
-    lines = []
-    if schwab_award_transactions_file is not None:
-        try:
-            with Path(schwab_award_transactions_file).open(
-                encoding="utf-8"
-            ) as csv_file:
-                lines = list(csv.reader(csv_file))
-                headers = lines[0]
-                required_headers = set(
-                    {header.value for header in AwardsTransactionsFileRequiredHeaders}
-                )
-                if not required_headers.issubset(headers):
-                    raise ParsingError(
-                        schwab_award_transactions_file,
-                        "Missing columns in awards file: "
-                        f"{required_headers.difference(headers)}",
-                    )
-
-                # Remove headers
-                lines = lines[1:]
-        except FileNotFoundError:
-            print(
-                "WARNING: Couldn't locate Schwab award "
-                f"file({schwab_award_transactions_file})"
-            )
-    else:
+    if schwab_award_transactions_file is None:
         print("WARNING: No schwab award file provided")
+        return AwardPrices(award_prices={})
+
+    try:
+        with Path(schwab_award_transactions_file).open(encoding="utf-8") as csv_file:
+            reader = csv.reader(csv_file)
+            headers = next(reader, [])
+            if not AWARDS_REQUIRED_HEADERS.issubset(headers):
+                raise ParsingError(
+                    schwab_award_transactions_file,
+                    "Missing columns in awards file: "
+                    f"{set(AWARDS_REQUIRED_HEADERS.difference(headers))}",
+                )
 
-    modulo = len(lines) % 2
-    if modulo != 0:
-        raise UnexpectedRowCountError(
-            len(lines) - modulo + 2, schwab_award_transactions_file or ""
-        )
-
-    for upper_row, lower_row in zip(lines[::2], lines[1::2]):
-        # in this format each row is split into two rows,
-        # so we combine them safely below
-        row = []
-        for upper_col, lower_col in zip(upper_row, lower_row):
-            assert upper_col == "" or lower_col == ""
-            row.append(upper_col + lower_col)
-
-        if len(row) != len(headers):
-            raise UnexpectedColumnCountError(
-                row, len(headers), schwab_award_transactions_file or ""
+            date_header = AwardsTransactionsFileRequiredHeaders.DATE.value
+            symbol_header = AwardsTransactionsFileRequiredHeaders.SYMBOL.value
+            price_header = (
+                AwardsTransactionsFileRequiredHeaders.FAIR_MARKET_VALUE_PRICE.value
             )
+            rows_count = 0
+            for upper_row in reader:
+                # in this format each row is split into two rows,
+                # so we combine them safely below
+                lower_row = next(reader, None)
+                if lower_row is None:
+                    raise UnexpectedRowCountError(
+                        rows_count + 2, schwab_award_transactions_file
+                    )
+                rows_count += 2
+                row = []
+                for upper, lower in zip(upper_row, lower_row):
+                    assert upper == "" or lower == ""
+                    # Take whichever is set, no need to concatenate
+                    row.append(upper or lower)
+
+                if len(row) != len(headers):
+                    raise UnexpectedColumnCountError(
+                        row, len(headers), schwab_award_transactions_file
+                    )
 
-        row_dict = OrderedDict(zip(headers, row))
-        date_header = AwardsTransactionsFileRequiredHeaders.DATE.value
-        date_str = row_dict[date_header]
-        try:
-            date = datetime.datetime.strptime(date_str, "%Y/%m/%d").date()
-        except ValueError:
-            date = datetime.datetime.strptime(date_str, "%m/%d/%Y").date()
-        symbol_header = AwardsTransactionsFileRequiredHeaders.SYMBOL.value
-        symbol = row_dict[symbol_header] if row_dict[symbol_header] != "" else None
-        fair_market_value_price_header = (
-            AwardsTransactionsFileRequiredHeaders.FAIR_MARKET_VALUE_PRICE.value
-        )
-        price = (
-            Decimal(row_dict[fair_market_value_price_header].replace("$", ""))
-            if row_dict[fair_market_value_price_header] != ""
-            else None
+                row_dict = OrderedDict(zip(headers, row))
+                date = parse_schwab_awards_date(row_dict[date_header])
+                symbol = row_dict[symbol_header] or None
+                price_str = row_dict[price_header]
+                price = _decimal_from_str(price_str) if price_str else None
+                if symbol is not None and price is not None:
+                    symbol = TICKER_RENAMES.get(symbol, symbol)
+                    initial_prices[date][symbol] = price
+    except FileNotFoundError:
+        print(
+            "WARNING: Couldn't locate Schwab award "
+            f"file({schwab_award_transactions_file})"
         )
-        if symbol is not None and price is not None:
-            symbol = TICKER_RENAMES.get(symbol, symbol)
-            initial_prices[date][symbol] = price
     return AwardPrices(award_prices=dict(initial_prices))
 
 def read_schwab_combined_transactions(
@@ -425,7 +449,10 @@ def read_schwab_combined_transactions(
             transactions_file=schwab_equity_award_json_transactions_file,
             transactions_folder=schwab_equity_award_json_transactions_folder,
         )
-        equity_awards_sym_dates = set((tr.date, tr.symbol) for tr in equity_transactions)
+        # If we have been provided Equity Awards data, we should ignore
+        # STOCK_ACTIVITY transactions from dates present in both.
+        # The Equity Awards data is more accurate.
+        equity_awards_sym_dates = {(tr.date, tr.symbol) for tr in equity_transactions}
     else:
         print("INFO: No schwab Equity Award JSON file provided")
         
@@ -436,21 +463,15 @@ def read_schwab_combined_transactions(
             transactions_folder=schwab_transactions_folder,
             schwab_award_transactions_folder=schwab_awards_transactions_folder,
             award_prices=award_prices,
+            ignored_sym_dates=equity_awards_sym_dates,
         )
     else:
         print("INFO: No schwab file provided")
     
     if equity_transactions:
-        # If we have been provided Equity Awards data, we should ignore STOCK_ACTIVITY transactions
-        # from dates present in both. The Equity Awards data is more accurate.
-        
-        clean_transactions: list[SchwabTransaction] = []
-        for tr in transactions:
-            if (tr.date, tr.symbol) in equity_awards_sym_dates:
-                print(f"INFO: Removing STOCK_ACTIVITY transaction already present in Equity Awards data: {tr.symbol}:{tr.date}:{tr.quantity}")
-            else:
-                clean_transactions.append(tr)
-        
-        transactions = sorted(chain(equity_transactions, clean_transactions),  key=lambda k: k.date)
+        # Both lists are already sorted by date, so merge them in a single pass
+        transactions = list(
+            heapq.merge(equity_transactions, transactions, key=lambda k: k.date)
+        )
     
     return transactions
\ No newline at end of file
@@ -24,11 +24,46 @@ from typing import Any, Final
 from cgt_calc.const import TICKER_RENAMES
 from cgt_calc.exceptions import ParsingError
 from cgt_calc.model import ActionType, BrokerTransaction
-from cgt_calc.parsers.schwab_util import AwardPrices
-from cgt_calc.util import round_decimal
+from cgt_calc.parsers.schwab_util import (
+    AwardPrices,
+    list_folder_files,
+    parse_schwab_date,
+)
+from cgt_calc.util import decimal_from_str, round_decimal
 
 OPTIONAL_DETAILS_NAME: Final = "Details"
 FIELD_TO_SCHEMA: Final = {"transactions": 1, "Transactions": 2}
+LABEL_TO_ACTION: Final[dict[str, ActionType]] = {
+    "Buy": ActionType.BUY,
+    "Sell": ActionType.SELL,
+    "Sale": ActionType.SELL,
+    "MoneyLink Transfer": ActionType.TRANSFER,
+    "Misc Cash Entry": ActionType.TRANSFER,
+    "Service Fee": ActionType.TRANSFER,
+    "Wire Funds": ActionType.TRANSFER,
+    "Wire Transfer": ActionType.TRANSFER,
+    "Funds Received": ActionType.TRANSFER,
+    "Journal": ActionType.TRANSFER,
+    "Cash In Lieu": ActionType.TRANSFER,
+    "Stock Plan Activity": ActionType.STOCK_ACTIVITY,
+    "Deposit": ActionType.STOCK_ACTIVITY,
+    "Lapse": ActionType.STOCK_ACTIVITY,
+    "Qualified Dividend": ActionType.DIVIDEND,
+    "Cash Dividend": ActionType.DIVIDEND,
+    "NRA Tax Adj": ActionType.TAX,
+    "NRA Withholding": ActionType.TAX,
+    "Foreign Tax Paid": ActionType.TAX,
+    "ADR Mgmt Fee": ActionType.FEE,
+    "Adjustment": ActionType.ADJUSTMENT,
+    "IRS Withhold Adj": ActionType.ADJUSTMENT,
+    "Short Term Cap Gain": ActionType.CAPITAL_GAIN,
+    "Long Term Cap Gain": ActionType.CAPITAL_GAIN,
+    "Spin-off": ActionType.SPIN_OFF,
+    "Credit Interest": ActionType.INTEREST,
+    "Reinvest Shares": ActionType.REINVEST_SHARES,
+    "Reinvest Dividend": ActionType.REINVEST_DIVIDENDS,
+    "Wire Funds Received": ActionType.WIRE_FUNDS_RECEIVED,
+}
 
 
 @dataclass
@@ -89,72 +124,17 @@ class FieldNames:
 # into float, but we want to get Decimal('1.0001'))
 ROUND_DIGITS = 6
 
+ZERO: Final = Decimal(0)
+
 JsonRowType = Any  # type: ignore[misc]
 
 
 def action_from_str(label: str) -> ActionType:
     """Convert string label to ActionType."""
-    if label in {"Buy"}:
-        return ActionType.BUY
-
-    if label in {"Sell", "Sale"}:
-        return ActionType.SELL
-
-    if label in {
-        "MoneyLink Transfer",
-        "Misc Cash Entry",
-        "Service Fee",
-        "Wire Funds",
-        "Wire Transfer",
-        "Funds Received",
-        "Journal",
-        "Cash In Lieu",
-    }:
-        return ActionType.TRANSFER
-
-    if label in {"Stock Plan Activity", "Deposit", "Lapse"}:
-        return ActionType.STOCK_ACTIVITY
-
-    if label in ["Qualified Dividend", "Cash Dividend"]:
-        return ActionType.DIVIDEND
-
-    if label in ["NRA Tax Adj", "NRA Withholding", "Foreign Tax Paid"]:
-        return ActionType.TAX
-
-    if label == "ADR Mgmt Fee":
-        return ActionType.FEE
-
-    if label in ["Adjustment", "IRS Withhold Adj"]:
-        return ActionType.ADJUSTMENT
-
-    if label in ["Short Term Cap Gain", "Long Term Cap Gain"]:
-        return ActionType.CAPITAL_GAIN
-
-    if label == "Spin-off":
-        return ActionType.SPIN_OFF
-
-    if label == "Credit Interest":
-        return ActionType.INTEREST
-
-    if label == "Reinvest Shares":
-        return ActionType.REINVEST_SHARES
-
-    if label == "Reinvest Dividend":
-        return ActionType.REINVEST_DIVIDENDS
-
-    if label == "Wire Funds Received":
-        return ActionType.WIRE_FUNDS_RECEIVED
-
-    raise ParsingError("schwab transactions", f"Unknown action: {label}")
-
-
-def _decimal_from_str(price_str: str) -> Decimal:
-    """Convert a number as string to a Decimal.
-
-    Remove $ sign, and comma thousand separators so as to handle dollar amounts
-    such as "$1,250.00".
-    """
-    return Decimal(price_str.replace("$", "").replace(",", ""))
+    action = LABEL_TO_ACTION.get(label)
+    if action is None:
+        raise ParsingError("schwab transactions", f"Unknown action: {label}")
+    return action
 
 
 def _decimal_from_number_or_str(
@@ -168,14 +148,16 @@ def _decimal_from_number_or_str(
     if the fields are not there or both have a value of None.
     """
     # We prefer native number to strings as more efficient/safer parsing
-    float_name = f"{field_basename}{field_float_suffix}"
-    if float_name in row and row[float_name] is not None:
-        return Decimal(row[float_name])
+    number = row.get(f"{field_basename}{field_float_suffix}")
+    if number is not None:
+        # JSON is loaded with parse_float=Decimal, so avoid copying Decimals
+        return number if isinstance(number, Decimal) else Decimal(number)
 
-    if field_basename in row and row[field_basename] is not None:
-        return _decimal_from_str(row[field_basename])
+    number_str = row.get(field_basename)
+    if number_str is not None:
+        return decimal_from_str(number_str)
 
-    return Decimal(0)
+    return ZERO
 
 
 def _is_integer(number: Decimal) -> bool:
@@ -185,6 +167,8 @@ def _is_integer(number: Decimal) -> bool:
 class SchwabTransaction(BrokerTransaction):
     """Represent single Schwab transaction."""
 
+    __slots__ = ("raw_action",)
+
     def __init__(self, row: JsonRowType, file: str, field_names: FieldNames) -> None:
         """Create a new SchwabTransaction from a JSON row."""
         names = field_names
@@ -210,13 +194,9 @@ class SchwabTransaction(BrokerTransaction):
                 details = row[names.transac_details][0]
                 
             try:
-                date = datetime.datetime.strptime(
-                    details[names.vest_date], "%m/%d/%Y"
-                ).date()
+                date = parse_schwab_date(details[names.vest_date])
             except KeyError:
-                date = datetime.datetime.strptime(
-                    row[names.date], "%m/%d/%Y"
-                ).date()
+                date = parse_schwab_date(row[names.date])
                 
             try:
                 quantity = _decimal_from_number_or_str(details, names.net_shares_deposited)
@@ -225,9 +205,9 @@ class SchwabTransaction(BrokerTransaction):
 
             # Schwab only provide this one as string:
             try:
-                price = _decimal_from_str(details[names.vest_fair_market_value])
+                price = decimal_from_str(details[names.vest_fair_market_value])
             except KeyError:
-                price = _decimal_from_str(details[names.fair_market_value])
+                price = decimal_from_str(details[names.fair_market_value])
 
             if amount == Decimal(0):
                 amount = price * quantity
@@ -237,7 +217,7 @@ class SchwabTransaction(BrokerTransaction):
                 f"(ID {details[names.award_id]})"
             )
         elif action == ActionType.SELL:
-            date = datetime.datetime.strptime(row[names.date], "%m/%d/%Y").date()
+            date = parse_schwab_date(row[names.date])
 
             # Schwab's data export sometimes lacks decimals on Sales
             # quantities, in which case we infer it from number of shares in
@@ -258,7 +238,7 @@ class SchwabTransaction(BrokerTransaction):
 
                     if "shares" in subtransac:
                         # Schwab only provides this one as a string:
-                        shares = _decimal_from_str(subtransac[names.shares])
+                        shares = decimal_from_str(subtransac[names.shares])
                         subtransac_shares_sum += shares
                         if not _is_integer(shares):
                             found_share_decimals = True
@@ -280,7 +260,7 @@ class SchwabTransaction(BrokerTransaction):
                         OPTIONAL_DETAILS_NAME, first_subtransac
                     )
                     price_str = first_subtransac[names.sale_price]
-                    price = _decimal_from_str(price_str)
+                    price = decimal_from_str(price_str)
 
                     for subtransac in row[names.transac_details][1:]:
                         subtransac = subtransac.get(OPTIONAL_DETAILS_NAME, subtransac)
@@ -365,7 +345,7 @@ def read_schwab_equity_award_json_transactions(
         files.append(transactions_file)
         
     if transactions_folder:
-        files.extend(Path(transactions_folder).glob("*.json"))
+        files.extend(list_folder_files(transactions_folder, ".json"))
 
     all_transactions: list[SchwabTransaction] = []
     for file in files:
@@ -1,38 +1,147 @@
+"""Utilities shared by Charles Schwab parsers."""
 
-from dataclasses import dataclass, replace
+from __future__ import annotations
+
+from dataclasses import dataclass
 import datetime
 from decimal import Decimal
+import functools
+import os
+from typing import TYPE_CHECKING, Final
 
 from cgt_calc.const import TICKER_RENAMES
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+# Number of days to search back from a transaction date to find its award
+AWARD_SEARCH_DAYS: Final = 7
+
+# Shape of dates the fast path parses, anything else is left to strptime
+DATE_PARTS_NUM: Final = 3
+YEAR_DIGITS: Final = 4
+MAX_MONTH_DAY_DIGITS: Final = 2
+
+
+def _date_from_parts(year: str, month: str, day: str) -> datetime.date | None:
+    """Build date from its string components, bypassing strptime.
+
+    Returns None if the components are not plain digits strptime would accept.
+    """
+    digits = year + month + day
+    if (
+        len(year) == YEAR_DIGITS
+        and 1 <= len(month) <= MAX_MONTH_DAY_DIGITS
+        and 1 <= len(day) <= MAX_MONTH_DAY_DIGITS
+        and digits.isascii()
+        and digits.isdigit()
+    ):
+        return datetime.date(int(year), int(month), int(day))
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_schwab_date(date_str: str) -> datetime.date:
+    """Parse MM/DD/YYYY date used in Schwab exports."""
+    # Exports have many rows for each date, so parsing results are cached
+    parts = date_str.split("/")
+    if len(parts) == DATE_PARTS_NUM:
+        month, day, year = parts
+        try:
+            date = _date_from_parts(year, month, day)
+        except ValueError:
+            date = None
+        if date is not None:
+            return date
+    # Let strptime report the error or handle unusual formatting
+    return datetime.datetime.strptime(date_str, "%m/%d/%Y").date()
+
 
-@dataclass
+@functools.lru_cache(maxsize=4096)
+def parse_schwab_awards_date(date_str: str) -> datetime.date:
+    """Parse YYYY/MM/DD or MM/DD/YYYY date from awards file."""
+    parts = date_str.split("/")
+    if len(parts) == DATE_PARTS_NUM:
+        first, second, third = parts
+        try:
+            if len(first) == YEAR_DIGITS:
+                date = _date_from_parts(first, second, third)
+            else:
+                date = _date_from_parts(third, first, second)
+        except ValueError:
+            date = None
+        if date is not None:
+            return date
+    try:
+        return datetime.datetime.strptime(date_str, "%Y/%m/%d").date()
+    except ValueError:
+        return datetime.datetime.strptime(date_str, "%m/%d/%Y").date()
+
+
+def list_folder_files(folder: str, suffix: str) -> list[str]:
+    """List files in folder with the given suffix, sorted by path."""
+    try:
+        with os.scandir(folder) as entries:
+            return sorted(
+                entry.path
+                for entry in entries
+                if entry.name.endswith(suffix) and entry.is_file()
+            )
+    except (FileNotFoundError, NotADirectoryError):
+        print(f"WARNING: Couldn't locate folder({folder})")
+        return []
+
+
+@dataclass(frozen=True)
 class AwardPrices:
-    """Class to store initial stock prices."""
+    """Class to store initial stock prices.
+
+    Instances are immutable: lookups go through an index built on first use,
+    so award_prices must not be modified after creation.
+    """
 
     award_prices: dict[datetime.date, dict[str, Decimal]]
 
+    @functools.cached_property
+    def _lookup(
+        self,
+    ) -> dict[tuple[datetime.date, str], tuple[datetime.date, Decimal]]:
+        """Map every (date, symbol) that may be searched to its award."""
+        # Award dates may go back for few days, depending on
+        # holidays or weekends, so each award covers the following
+        # week. Closer awards are written last to take precedence.
+        lookup: dict[tuple[datetime.date, str], tuple[datetime.date, Decimal]] = {}
+        for days in reversed(range(AWARD_SEARCH_DAYS)):
+            delta = datetime.timedelta(days=days)
+            for date, prices in self.award_prices.items():
+                for symbol, price in prices.items():
+                    lookup[(date + delta, symbol)] = (date, price)
+        return lookup
+
     def get(self, date: datetime.date, symbol: str) -> tuple[datetime.date, Decimal]:
         """Get initial stock price at given date."""
-        # Award dates may go back for few days, depending on
-        # holidays or weekends, so we do a linear search
-        # in the past to find the award price
         symbol = TICKER_RENAMES.get(symbol, symbol)
-        for i in range(7):
-            to_search = date - datetime.timedelta(days=i)
-
-            if (
-                to_search in self.award_prices
-                and symbol in self.award_prices[to_search]
-            ):
-                return (to_search, self.award_prices[to_search][symbol])
-            
-        raise KeyError(f"Award price is not found for symbol {symbol} for date {date}")
-    
-    def merge(self, other: 'AwardPrices') -> None:
-        """Merge two AwardPrices objects."""
-        
-        new_prices = self.award_prices.copy()
-        new_prices.update(other.award_prices)
-        return replace(self, award_prices=new_prices)
+        award = self._lookup.get((date, symbol))
+        if award is None:
+            raise KeyError(
+                f"Award price is not found for symbol {symbol} for date {date}"
+            )
+        return award
+
+    def merge(self, other: AwardPrices) -> AwardPrices:
+        """Merge two AwardPrices objects, other takes precedence."""
+        if not other.award_prices:
+            return self
+        if not self.award_prices:
+            return other
+        return AwardPrices.merge_many((self, other))
 
+    @classmethod
+    def merge_many(cls, parts: Iterable[AwardPrices]) -> AwardPrices:
+        """Merge several AwardPrices objects at once, later ones take precedence."""
+        award_prices: dict[datetime.date, dict[str, Decimal]] = {}
+        for part in parts:
+            for date, prices in part.award_prices.items():
+                # Different files may have awards for other symbols on the same date
+                award_prices.setdefault(date, {}).update(prices)
+        return cls(award_prices=award_prices)
@@ -2,6 +2,10 @@
 
 import decimal
 from decimal import Decimal
+from typing import Final
+
+# Translation table removing $ sign and comma thousand separators
+_STRIP_CURRENCY: Final = str.maketrans("", "", "$,")
 
 
 def round_decimal(value: Decimal, digits: int = 0) -> Decimal:
@@ -14,3 +18,12 @@ def round_decimal(value: Decimal, digits: int = 0) -> Decimal:
 def strip_zeros(value: Decimal) -> str:
     """Strip trailing zeros from Decimal."""
     return f"{value:.10f}".rstrip("0").rstrip(".")
+
+
+def decimal_from_str(price_str: str) -> Decimal:
+    """Convert a number as string to a Decimal.
+
+    Remove $ sign, and comma thousand separators so as to handle dollar amounts
+    such as "$1,250.00".
+    """
+    return Decimal(price_str.translate(_STRIP_CURRENCY))
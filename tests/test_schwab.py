@@ -0,0 +1,35 @@
+"""Unit tests on schwab.py."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import shutil
+
+import pytest
+
+from cgt_calc.parsers.schwab import read_schwab_transactions
+
+TRANSACTIONS_FILE = Path("tests") / "test_data" / "schwab_transactions.csv"
+CASH_MERGER_FILE = (
+    Path("tests") / "test_data" / "schwab_cash_merger" / "transactions.csv"
+)
+
+
+def test_read_schwab_transactions_folder(
+    tmp_path: Path, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test reading a folder matches reading its files one by one."""
+    shutil.copy(CASH_MERGER_FILE, tmp_path / "a.csv")
+    shutil.copy(TRANSACTIONS_FILE, tmp_path / "b.csv")
+    expected = [
+        *read_schwab_transactions(str(CASH_MERGER_FILE), None, None, None),
+        *read_schwab_transactions(str(TRANSACTIONS_FILE), None, None, None),
+    ]
+    expected.sort(key=lambda k: k.date)
+    capsys.readouterr()
+
+    transactions = read_schwab_transactions(None, str(tmp_path), None, None)
+
+    assert transactions == expected
+    assert capsys.readouterr().out.count("WARNING: Cash Merger") == 1
+
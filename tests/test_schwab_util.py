@@ -0,0 +1,130 @@
+"""Unit tests on schwab_util.py."""
+
+from __future__ import annotations
+
+import datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING
+
+import pytest
+
+from cgt_calc.parsers.schwab_util import (
+    AwardPrices,
+    list_folder_files,
+    parse_schwab_awards_date,
+    parse_schwab_date,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_parse_schwab_date() -> None:
+    """Test parse_schwab_date() on valid MM/DD/YYYY dates."""
+    assert parse_schwab_date("03/15/2023") == datetime.date(2023, 3, 15)
+    assert parse_schwab_date("3/5/2023") == datetime.date(2023, 3, 5)
+
+
+@pytest.mark.parametrize(
+    "date_str",
+    ["03/15/23", " 03/15/2023", "03/15/2023 ", "+3/15/2023", "13/15/2023"],
+)
+def test_parse_schwab_date_invalid(date_str: str) -> None:
+    """Test parse_schwab_date() rejects dates strptime rejects."""
+    with pytest.raises(ValueError, match="does not match|unconverted"):
+        parse_schwab_date(date_str)
+
+
+def test_parse_schwab_awards_date() -> None:
+    """Test parse_schwab_awards_date() on both supported formats."""
+    assert parse_schwab_awards_date("2023/03/15") == datetime.date(2023, 3, 15)
+    assert parse_schwab_awards_date("2023/3/5") == datetime.date(2023, 3, 5)
+    assert parse_schwab_awards_date("03/15/2023") == datetime.date(2023, 3, 15)
+
+
+@pytest.mark.parametrize(
+    "date_str", ["03/15/23", "23/03/15", " 2023/03/15", "2023/03/15 "]
+)
+def test_parse_schwab_awards_date_invalid(date_str: str) -> None:
+    """Test parse_schwab_awards_date() rejects dates strptime rejects."""
+    with pytest.raises(ValueError, match="does not match|unconverted"):
+        parse_schwab_awards_date(date_str)
+
+
+def test_award_prices_merge_same_date() -> None:
+    """Test AwardPrices.merge() keeps all symbols awarded on the same date."""
+    date = datetime.date(2023, 3, 15)
+    first = AwardPrices({date: {"GOOG": Decimal("90.1"), "META": Decimal("190")}})
+    second = AwardPrices({date: {"GOOG": Decimal("91.5"), "MSFT": Decimal("250")}})
+
+    merged = first.merge(second)
+
+    assert merged.get(date, "GOOG") == (date, Decimal("91.5"))
+    assert merged.get(date, "META") == (date, Decimal("190"))
+    assert merged.get(date, "MSFT") == (date, Decimal("250"))
+    # Inputs are left untouched
+    assert first.award_prices[date]["GOOG"] == Decimal("90.1")
+    assert "MSFT" not in first.award_prices[date]
+
+
+def test_award_prices_merge_empty() -> None:
+    """Test AwardPrices.merge() with an empty side."""
+    prices = AwardPrices({datetime.date(2023, 3, 15): {"GOOG": Decimal("90.1")}})
+
+    assert prices.merge(AwardPrices({})) is prices
+    assert AwardPrices({}).merge(prices) is prices
+
+
+def test_award_prices_get_search_window() -> None:
+    """Test AwardPrices.get() finds awards up to a week before the date."""
+    date = datetime.date(2023, 3, 15)
+    prices = AwardPrices({date: {"GOOG": Decimal("90.1")}})
+
+    for days in range(7):
+        lookup_date = date + datetime.timedelta(days=days)
+        assert prices.get(lookup_date, "GOOG") == (date, Decimal("90.1"))
+    with pytest.raises(KeyError):
+        prices.get(date + datetime.timedelta(days=7), "GOOG")
+    with pytest.raises(KeyError):
+        prices.get(date - datetime.timedelta(days=1), "GOOG")
+    with pytest.raises(KeyError):
+        prices.get(date, "META")
+
+
+def test_award_prices_get_closest_award() -> None:
+    """Test AwardPrices.get() picks the closest award within the window."""
+    first = datetime.date(2023, 3, 13)
+    second = datetime.date(2023, 3, 16)
+    # Later award listed first, the result must not depend on order
+    prices = AwardPrices(
+        {second: {"GOOG": Decimal("91.5")}, first: {"GOOG": Decimal("90.1")}}
+    )
+
+    assert prices.get(datetime.date(2023, 3, 15), "GOOG") == (first, Decimal("90.1"))
+    assert prices.get(second, "GOOG") == (second, Decimal("91.5"))
+    assert prices.get(datetime.date(2023, 3, 22), "GOOG") == (
+        second,
+        Decimal("91.5"),
+    )
+
+
+def test_list_folder_files(tmp_path: Path) -> None:
+    """Test list_folder_files() returns matching files sorted by path."""
+    (tmp_path / "b.csv").write_text("")
+    (tmp_path / "a.csv").write_text("")
+    (tmp_path / "c.json").write_text("")
+    (tmp_path / "d.csv").mkdir()
+
+    assert list_folder_files(str(tmp_path), ".csv") == [
+        str(tmp_path / "a.csv"),
+        str(tmp_path / "b.csv"),
+    ]
+
+
+def test_list_folder_files_not_a_folder(tmp_path: Path) -> None:
+    """Test list_folder_files() warns instead of failing without a folder."""
+    file = tmp_path / "a.csv"
+    file.write_text("")
+
+    assert list_folder_files(str(file), ".csv") == []
+    assert list_folder_files(str(tmp_path / "missing"), ".csv") == []
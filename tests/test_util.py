@@ -0,0 +1,12 @@
+"""Unit tests on util.py."""
+
+from __future__ import annotations
+
+from decimal import Decimal
+
+from cgt_calc.util import decimal_from_str
+
+
+def test_decimal_from_str() -> None:
+    """Test decimal_from_str()."""
+    assert decimal_from_str("$123,456.23") == Decimal("123456.23")